@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 from room_allocation_system import HostelAllocationSystem
-import json
 from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
@@ -13,19 +12,148 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize session state
-if 'system' not in st.session_state:
-    st.session_state.system = HostelAllocationSystem()
+# The hostel state is shared across all user sessions: cache_resource hands
+# every session the same instance instead of re-initializing per session.
+# Mutations are guarded by a lock inside HostelAllocationSystem.
+@st.cache_resource
+def get_system() -> HostelAllocationSystem:
+    return HostelAllocationSystem()
 
+
+system = get_system()
+
+# Per-user view history stays in session_state
 if 'allocation_results' not in st.session_state:
     st.session_state.allocation_results = []
 
+
+@st.cache_data
+def compute_occupancy(version: int, _system) -> pd.DataFrame:
+    """Build the per-floor occupancy DataFrame (cached per allocation version).
+
+    Reads the incrementally maintained occupied_slot_count on each Floor,
+    so no per-room iteration happens here.
+    """
+    occupancy_data = [
+        {
+            'Building': building_name,
+            'Floor': floor_name,
+            'Total Slots': len(floor.rooms) * 2,
+            'Occupied Slots': floor.occupied_slot_count,
+            'Available Slots': len(floor.rooms) * 2 - floor.occupied_slot_count
+        }
+        for building_name, building in _system.buildings.items()
+        for floor_name, floor in building.items()
+    ]
+
+    occupancy_df = pd.DataFrame(occupancy_data)
+    occupancy_df['Occupancy %'] = (occupancy_df['Occupied Slots'] / occupancy_df['Total Slots'] * 100).round(1)
+    # Arrow-backed dtypes make st.dataframe's Arrow serialization zero-copy
+    return occupancy_df.convert_dtypes(dtype_backend='pyarrow')
+
+
+@st.cache_data
+def compute_complete_allocation(version: int, _system) -> pd.DataFrame:
+    """Build the complete allocation DataFrame (cached per allocation version)."""
+    df = _system.to_dataframe()
+    occupied = df[df['representative'] != '']
+    return occupied.rename(columns={
+        'representative': 'Roll Number',
+        'room_id': 'Room Number',
+        'building': 'Building',
+        'floor': 'Floor'
+    })[['Roll Number', 'Room Number', 'Building', 'Floor']].convert_dtypes(dtype_backend='pyarrow')
+
+
+@st.cache_data
+def compute_history_df(version: int, _system) -> pd.DataFrame:
+    """Build the allocation-history DataFrame (cached per allocation version).
+
+    Timestamp parsing and row construction run once per state change
+    instead of on every rerun of the history view.
+    """
+    history_data = [
+        {
+            'Index': idx + 1,
+            'Timestamp': pd.Timestamp(record['timestamp']).strftime('%Y-%m-%d %H:%M:%S'),
+            'Rooms Allocated': record['group_size'],
+            'Students Accommodated': record['group_size'] * 2,
+            'Representatives': ', '.join(record['allocation'].keys())
+        }
+        for idx, record in enumerate(_system.allocation_history)
+    ]
+    return pd.DataFrame(history_data).convert_dtypes(dtype_backend='pyarrow')
+
+
+@st.cache_data
+def build_occupancy_fig(version: int, _system) -> dict:
+    """Build the occupancy bar chart as a plain dict (cached per allocation version).
+
+    Plotly figure construction runs substantial pure-Python validation, so
+    it is worth skipping on reruns that didn't change any allocation.
+    """
+    occupancy_df = compute_occupancy(version, _system)
+    fig = px.bar(occupancy_df, x='Floor', y='Occupancy %',
+                 color='Building',
+                 title='Floor-wise Occupancy Percentage',
+                 labels={'Occupancy %': 'Occupancy Percentage'},
+                 color_discrete_map={'A': '#1f77b4', 'B': '#ff7f0e'})
+    fig.update_layout(yaxis_range=[0, 100])
+    return fig.to_dict()
+
+
+def render_room_grid(floor) -> str:
+    """Render a floor's rooms as one HTML grid blob.
+
+    Emitting a single st.markdown keeps the frontend delta count at 1 per
+    floor instead of one widget message per room.
+    """
+    cells = []
+    for room in floor.rooms:
+        if room.is_available:
+            if room.occupant_count == 0:
+                color, label = '#d4edda', f"🟢 {room.number}<br>(Empty)"
+            elif room.representative is not None:
+                color, label = '#fff3cd', f"🟡 {room.number}<br>({room.representative})"
+            else:
+                color, label = '#fff3cd', f"🟡 {room.number}<br>(Occupied)"
+        else:
+            color, label = '#f8d7da', f"🔴 {room.number}<br>(Full)"
+        cells.append(
+            f'<div style="background-color:{color};padding:8px;'
+            f'border-radius:5px;text-align:center;">{label}</div>'
+        )
+
+    return ('<div style="display:grid;grid-template-columns:repeat(5,1fr);gap:8px;">'
+            + ''.join(cells) + '</div>')
+
+
+@st.cache_data
+def complete_allocation_csv(version: int, _system) -> bytes:
+    """CSV bytes for the complete allocation download (cached per allocation version)."""
+    complete_df = compute_complete_allocation(version, _system)
+    return complete_df.sort_values(['Building', 'Floor', 'Room Number']).to_csv(index=False).encode()
+
+
+@st.cache_data
+def latest_allocation_csv(timestamp: datetime, _df: pd.DataFrame) -> bytes:
+    """CSV bytes for the latest allocation download (cached per allocation timestamp).
+
+    The timestamp uniquely identifies one allocation result, so the
+    cache survives resets and shared-system sessions without ever
+    serving another result's bytes.
+    """
+    return _df.to_csv(index=False).encode()
+
+
+@st.cache_data
+def sample_rolls(n: int) -> str:
+    """Comma-separated sample roll numbers for testing (cached per group size)."""
+    return ", ".join(f"R{i:03d}" for i in range(1, n + 1))
+
 # Custom CSS for better styling
 st.markdown("""
 <style>
-    .stTabs [data-baseweb="tab-list"] button [data-testid="stMarkdownContainer"] p {
-        font-size: 16px;
-    }
     .allocation-success {
         background-color: #d4edda;
         border: 1px solid #c3e6cb;
@@ -52,7 +180,7 @@ with st.sidebar:
     st.header("System Controls")
     
     if st.button("🔄 Reset All Allocations", type="secondary", use_container_width=True):
-        st.session_state.system.reset_allocations()
+        system.reset_allocations()
         st.session_state.allocation_results = []
         st.success("All allocations have been reset!")
     
@@ -65,7 +193,7 @@ with st.sidebar:
     save_filename = st.text_input("Filename to save", value="hostel_state.json")
     if st.button("💾 Save Current State", use_container_width=True):
         try:
-            st.session_state.system.save_state(save_filename)
+            system.save_state(save_filename)
             st.success(f"State saved to {save_filename}")
         except Exception as e:
             st.error(f"Error saving state: {e}")
@@ -74,22 +202,32 @@ with st.sidebar:
     uploaded_file = st.file_uploader("Load state from file", type=['json'])
     if uploaded_file is not None:
         try:
-            state_data = json.load(uploaded_file)
-            # Create a temporary file to load from
-            temp_filename = "temp_state.json"
-            with open(temp_filename, 'w') as f:
-                json.dump(state_data, f)
-            st.session_state.system.load_state(temp_filename)
+            # UploadedFile is already a BytesIO; stream-parse it directly
+            system.load_state_stream(uploaded_file)
             st.success("State loaded successfully!")
             st.rerun()
         except Exception as e:
             st.error(f"Error loading state: {e}")
 
-# Main content area with tabs
-tab1, tab2, tab3, tab4 = st.tabs(["🎯 Allocate Rooms", "📊 Hostel Status", "📋 Allocation History", "🏗️ Building Layout"])
+# Main content area. st.tabs executes every tab body on each rerun, so a
+# radio-driven selector is used instead: only the active section's
+# aggregation/figure work runs.
+active_tab = st.radio(
+    "Navigation",
+    ["🎯 Allocate Rooms", "📊 Hostel Status", "📋 Allocation History", "🏗️ Building Layout"],
+    horizontal=True,
+    label_visibility="collapsed"
+)
+st.markdown("---")
+
+# Each section is a fragment: widget interactions inside it (text areas,
+# checkboxes, selectboxes) rerun only the fragment, not the whole script.
+# Actions that mutate shared allocation state promote to a full rerun
+# with st.rerun(scope="app").
 
 # Tab 1: Room Allocation
-with tab1:
+@st.fragment
+def render_allocate_tab():
     st.header("Allocate Rooms for Student Groups")
     st.info("📌 **Note**: Enter one roll number per room. Each student has already chosen their roommate.")
     
@@ -107,8 +245,7 @@ with tab1:
             
             # Generate sample roll numbers for testing
             if st.checkbox("Use sample roll numbers for testing"):
-                roll_numbers = [f"R{i:03d}" for i in range(1, group_size + 1)]
-                roll_numbers_input = ", ".join(roll_numbers)
+                roll_numbers_input = sample_rolls(group_size)
             else:
                 roll_numbers_input = st.text_area(
                     "Enter Roll Numbers (one per room, comma-separated)",
@@ -141,19 +278,40 @@ with tab1:
                     
                     if len(roll_numbers) != group_size:
                         st.error(f"Number of roll numbers ({len(roll_numbers)}) doesn't match number of rooms ({group_size})")
+                    elif len(set(roll_numbers)) != len(roll_numbers):
+                        # Fail fast before touching the allocator
+                        st.error("Duplicate roll numbers found - each room needs a distinct representative")
                     else:
-                        allocation = st.session_state.system.allocate_rooms(group_size, roll_numbers)
-                        
+                        allocation, stats = system.allocate_rooms(group_size, roll_numbers)
+
+                        # Build the result DataFrame once, at allocation time,
+                        # straight from the RoomRef fields — no string parsing
+                        allocation_data = [
+                            {
+                                'Roll Number': roll,
+                                'Building': ref.building,
+                                'Floor': ref.floor,
+                                'Room': ref.number,
+                                'Full Room ID': ref.full_id
+                            }
+                            for roll, ref in allocation.items()
+                        ]
+
                         # Store result for history
                         result = {
                             'timestamp': datetime.now(),
                             'group_size': group_size,
-                            'allocation': allocation
+                            'allocation': allocation,
+                            'stats': stats,
+                            'df': pd.DataFrame(allocation_data).convert_dtypes(dtype_backend='pyarrow')
                         }
                         st.session_state.allocation_results.append(result)
-                        
+
                         st.success(f"✅ {group_size} rooms allocated successfully for {group_size * 2} students!")
-                        
+
+                        # Shared hostel state changed; propagate beyond the fragment
+                        st.rerun(scope="app")
+
                 except Exception as e:
                     st.error(f"❌ Allocation failed: {e}")
             else:
@@ -164,23 +322,10 @@ with tab1:
         
         if st.session_state.allocation_results:
             latest_result = st.session_state.allocation_results[-1]
-            
-            # Create allocation dataframe
-            allocation_data = []
-            for roll, room in latest_result['allocation'].items():
-                building = room[0]
-                floor = room[:2]
-                room_num = room.split('-')[1]
-                allocation_data.append({
-                    'Roll Number': roll,
-                    'Building': building,
-                    'Floor': floor,
-                    'Room': room_num,
-                    'Full Room ID': room
-                })
-            
-            df = pd.DataFrame(allocation_data)
-            
+
+            # DataFrame was pre-built at allocation time
+            df = latest_result['df']
+
             # Display summary
             col2_1, col2_2, col2_3 = st.columns(3)
             with col2_1:
@@ -188,13 +333,13 @@ with tab1:
             with col2_2:
                 st.metric("Students Accommodated", len(df) * 2)
             with col2_3:
-                st.metric("Floors Used", df['Floor'].nunique())
+                st.metric("Floors Used", latest_result['stats']['floors_used'])
             
             # Display allocation table
             st.dataframe(df, use_container_width=True, height=400)
             
             # Download button for allocation
-            csv = df.to_csv(index=False)
+            csv = latest_allocation_csv(latest_result['timestamp'], df)
             st.download_button(
                 label="📥 Download Allocation as CSV",
                 data=csv,
@@ -203,10 +348,12 @@ with tab1:
             )
 
 # Tab 2: Hostel Status
-with tab2:
+@st.fragment
+def render_status_tab():
     st.header("Current Hostel Status")
     
-    status = st.session_state.system.get_hostel_status()
+    # Counter-backed totals; no per-room walk
+    status = system.get_status_summary()
     
     # Overall statistics
     col1, col2, col3, col4, col5, col6 = st.columns(6)
@@ -229,27 +376,14 @@ with tab2:
     col_download1, col_download2 = st.columns(2)
     
     with col_download1:
-        # Generate complete allocation list
-        complete_allocation = []
-        for building_name, building in st.session_state.system.buildings.items():
-            for floor_name, floor in building.items():
-                for room in floor.rooms:
-                    if len(room.occupied_by) > 0:
-                        # Get the representative student (first one)
-                        representative = room.occupied_by[0]
-                        if not representative.endswith('_roommate'):
-                            complete_allocation.append({
-                                'Roll Number': representative,
-                                'Room Number': room.room_id,
-                                'Building': building_name,
-                                'Floor': floor_name
-                            })
-        
-        if complete_allocation:
-            complete_df = pd.DataFrame(complete_allocation)
+        # Generate complete allocation list (cached per allocation version)
+        complete_df = compute_complete_allocation(system.state_version,
+                                                  system)
+
+        if not complete_df.empty:
             complete_df = complete_df.sort_values(['Building', 'Floor', 'Room Number'])
-            
-            csv_complete = complete_df.to_csv(index=False)
+
+            csv_complete = complete_allocation_csv(system.state_version, system)
             st.download_button(
                 label="📥 Download Complete Allocation List (CSV)",
                 data=csv_complete,
@@ -264,38 +398,18 @@ with tab2:
     
     with col_download2:
         # Summary statistics
-        if complete_allocation:
+        if not complete_df.empty:
             st.markdown("**Allocation Summary:**")
-            summary_df = pd.DataFrame(complete_allocation).groupby(['Building', 'Floor']).size().reset_index(name='Rooms Allocated')
+            summary_df = complete_df.groupby(['Building', 'Floor']).size().reset_index(name='Rooms Allocated')
             st.dataframe(summary_df, use_container_width=True, hide_index=True)
     
     st.markdown("---")
     
     # Occupancy visualization
     st.subheader("Occupancy Overview")
-    
-    # Create occupancy data for visualization
-    occupancy_data = []
-    for building_name, building in st.session_state.system.buildings.items():
-        for floor_name, floor in building.items():
-            occupancy_data.append({
-                'Building': building_name,
-                'Floor': floor_name,
-                'Total Slots': len(floor.rooms) * 2,
-                'Occupied Slots': sum(len(room.occupied_by) for room in floor.rooms),
-                'Available Slots': floor.total_available_slots
-            })
-    
-    occupancy_df = pd.DataFrame(occupancy_data)
-    occupancy_df['Occupancy %'] = (occupancy_df['Occupied Slots'] / occupancy_df['Total Slots'] * 100).round(1)
-    
-    # Bar chart for occupancy
-    fig = px.bar(occupancy_df, x='Floor', y='Occupancy %', 
-                 color='Building', 
-                 title='Floor-wise Occupancy Percentage',
-                 labels={'Occupancy %': 'Occupancy Percentage'},
-                 color_discrete_map={'A': '#1f77b4', 'B': '#ff7f0e'})
-    fig.update_layout(yaxis_range=[0, 100])
+
+    # Bar chart for occupancy (figure dict cached per allocation version)
+    fig = go.Figure(build_occupancy_fig(system.state_version, system))
     st.plotly_chart(fig, use_container_width=True)
     
     # Detailed floor information
@@ -303,58 +417,32 @@ with tab2:
     
     building_select = st.selectbox("Select Building", ["A", "B"])
     
-    building_data = st.session_state.system.buildings[building_select]
+    building_data = system.buildings[building_select]
     
     for floor_name, floor in building_data.items():
         with st.expander(f"📍 {floor_name} - {floor.total_available_slots} slots available"):
-            # Room grid visualization
-            room_cols = st.columns(5)
-            
-            for idx, room in enumerate(floor.rooms):
-                col_idx = idx % 5
-                with room_cols[col_idx]:
-                    if room.is_available:
-                        if len(room.occupied_by) == 0:
-                            st.success(f"🟢 {room.number}\n(Empty)")
-                        else:
-                            # Show only the representative student
-                            representative = room.occupied_by[0]
-                            if not representative.endswith('_roommate'):
-                                st.warning(f"🟡 {room.number}\n({representative})")
-                            else:
-                                st.warning(f"🟡 {room.number}\n(Occupied)")
-                    else:
-                        st.error(f"🔴 {room.number}\n(Full)")
+            # Room grid visualization: one markdown blob per floor
+            st.markdown(render_room_grid(floor), unsafe_allow_html=True)
 
 # Tab 3: Allocation History
-with tab3:
+@st.fragment
+def render_history_tab():
     st.header("Allocation History")
     
-    if st.session_state.system.allocation_history:
-        # Convert history to dataframe
-        history_data = []
-        for idx, record in enumerate(st.session_state.system.allocation_history):
-            timestamp = datetime.fromisoformat(record['timestamp'])
-            history_data.append({
-                'Index': idx + 1,
-                'Timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                'Rooms Allocated': record['group_size'],
-                'Students Accommodated': record['group_size'] * 2,
-                'Representatives': ', '.join(record['allocation'].keys())
-            })
-        
-        history_df = pd.DataFrame(history_data)
-        
+    if system.allocation_history:
+        # History DataFrame is cached per allocation version
+        history_df = compute_history_df(system.state_version, system)
+
         # Display history table
         st.dataframe(history_df, use_container_width=True)
         
         # Select allocation to view details
         if st.checkbox("View allocation details"):
             selected_idx = st.selectbox("Select allocation", 
-                                      options=range(len(st.session_state.system.allocation_history)),
+                                      options=range(len(system.allocation_history)),
                                       format_func=lambda x: f"Allocation {x+1} - {history_df.iloc[x]['Timestamp']}")
             
-            selected_allocation = st.session_state.system.allocation_history[selected_idx]['allocation']
+            selected_allocation = system.allocation_history[selected_idx]['allocation']
             
             # Display selected allocation
             allocation_detail = []
@@ -367,7 +455,8 @@ with tab3:
         st.info("No allocations have been made yet.")
 
 # Tab 4: Building Layout
-with tab4:
+@st.fragment
+def render_layout_tab():
     st.header("Building Layout Reference")
     
     col1, col2 = st.columns(2)
@@ -405,6 +494,17 @@ with tab4:
     - ✅ **State Persistence**: Save and load allocation states
     """)
 
+
+# Render only the active section
+if active_tab == "🎯 Allocate Rooms":
+    render_allocate_tab()
+elif active_tab == "📊 Hostel Status":
+    render_status_tab()
+elif active_tab == "📋 Allocation History":
+    render_history_tab()
+else:
+    render_layout_tab()
+
 # Footer
 st.markdown("---")
 st.markdown("🏢 Hostel Room Allocation System v1.0 | Built with Streamlit")
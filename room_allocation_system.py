@@ -1,75 +1,162 @@
+import heapq
 import random
-from typing import Dict, List, Tuple, Set
+import threading
+from typing import Dict, List, Optional, Tuple, Set
 from dataclasses import dataclass, field
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 import json
 from datetime import datetime
 
-@dataclass
+try:
+    import orjson  # ~5x faster than stdlib json for parse and serialize
+except ImportError:
+    orjson = None
+
+# Parsed room reference handed back by allocate_rooms; callers read the
+# fields directly instead of re-slicing the room-id string.
+RoomRef = namedtuple('RoomRef', 'building floor number full_id')
+
+
+@dataclass(slots=True)
 class Room:
     """Represents a single room in the hostel."""
     building: str
     floor: str
     number: str
     capacity: int = 2
-    occupied_by: List[str] = field(default_factory=list)
-    
-    @property
-    def room_id(self) -> str:
-        """Returns unique room identifier."""
-        return f"{self.building}{self.floor}-{self.number}"
-    
+    # Number of students placed in the room. An integer count replaces
+    # the old occupant name list — the roommate entries in that list were
+    # synthesized placeholder strings that existed only to make the
+    # length checks work, so only the count and the representative carry
+    # real information.
+    occupant_count: int = 0
+    # Roll number of the representative student, set when the room is
+    # allocated; None while the room is empty.
+    representative: Optional[str] = None
+    # Unique room identifier, formatted once at construction instead of
+    # on every access (hot in status dumps and allocation writes)
+    room_id: str = field(init=False)
+    number_int: int = field(init=False)
+
+    def __post_init__(self):
+        self.room_id = f"{self.building}{self.floor}-{self.number}"
+        self.number_int = int(self.number)
+
     @property
     def is_available(self) -> bool:
         """Check if room has available space."""
-        return len(self.occupied_by) < self.capacity
-    
+        return self.occupant_count < self.capacity
+
     @property
     def available_slots(self) -> int:
         """Returns number of available slots in the room."""
-        return self.capacity - len(self.occupied_by)
+        return self.capacity - self.occupant_count
+
+    def occupy(self, representative: str, floor: "Floor"):
+        """Fill the room with a student pair and keep the floor's availability counters in sync."""
+        self.occupant_count = self.capacity
+        self.representative = representative
+        floor.occupied_slot_count += self.capacity
+        floor._avail_slots -= self.capacity
+        # The room is no longer completely free; drop it from the
+        # contiguous-run bitmask
+        floor._avail_mask &= ~(1 << self.number_int)
+        floor._version += 1
+        floor._avail_rooms -= 1
 
-@dataclass
+@dataclass(slots=True)
 class Floor:
     """Represents a floor in a building."""
     building: str
     floor_number: str
     rooms: List[Room] = field(default_factory=list)
-    
-    @property
-    def floor_id(self) -> str:
-        """Returns unique floor identifier."""
-        return f"{self.building}{self.floor_number}"
-    
+    # Incrementally maintained occupancy/availability counters (kept in
+    # sync by Room.occupy); let status views and the allocation hot
+    # path read per-floor totals without iterating every room.
+    occupied_slot_count: int = 0
+    _avail_rooms: int = 0
+    _avail_slots: int = 0
+    # Bitmask with bit n set when room number n is completely free, plus
+    # a number -> Room map for direct addressing of run members.
+    _avail_mask: int = 0
+    rooms_by_num: Dict[int, Room] = field(default_factory=dict)
+    # Maximal runs of number-adjacent rooms, precomputed once at init.
+    # The layout never changes after construction, so queries only need
+    # to split these static templates on currently occupied rooms.
+    run_templates: List[List[Room]] = field(default_factory=list)
+    # Mutation version plus memoized continuous-group result; both
+    # allocation paths may query the same unchanged floor repeatedly.
+    _version: int = 0
+    _groups_cache: Optional[List[List[Room]]] = None
+    _groups_cache_version: int = -1
+    # Unique floor identifier, formatted once at construction
+    floor_id: str = field(init=False)
+
+    def __post_init__(self):
+        self.floor_id = f"{self.building}{self.floor_number}"
+
     @property
     def available_rooms(self) -> List[Room]:
         """Returns list of rooms with available space."""
         return [room for room in self.rooms if room.is_available]
-    
+
+    @property
+    def available_room_count(self) -> int:
+        """Returns number of rooms with available space (counter read, O(1))."""
+        return self._avail_rooms
+
     @property
     def total_available_slots(self) -> int:
-        """Returns total number of available slots on the floor."""
-        return sum(room.available_slots for room in self.available_rooms)
+        """Returns total number of available slots on the floor (counter read, O(1))."""
+        return self._avail_slots
     
+    def find_run_start(self, k: int) -> int:
+        """Find the lowest-numbered start of k consecutive empty rooms.
+
+        SWAR over the availability bitmask: k-length runs survive
+        O(log k) shift-and-AND steps, so no Python-level room scan is
+        needed. Returns the starting room number, or -1 if no such run
+        exists. Gaps in a floor's numbering are unset bits and naturally
+        break runs.
+        """
+        m = self._avail_mask
+        run = 1
+        while run < k and m:
+            step = min(run, k - run)
+            m &= m >> step
+            run += step
+        if not m:
+            return -1
+        return (m & -m).bit_length() - 1
+
     def get_continuous_available_rooms(self) -> List[List[Room]]:
-        """Returns groups of continuous available rooms."""
-        if not self.available_rooms:
+        """Returns groups of continuous available rooms.
+
+        Walks the precomputed adjacency templates and splits each one on
+        occupied rooms, so no room-number comparison or sorting happens
+        at query time — adjacency was settled once at construction. The
+        result is memoized against the floor's mutation version, so
+        repeat queries on an unchanged floor return the cached groups.
+        """
+        if not self._avail_mask:
             return []
-        
-        # Sort rooms by number
-        sorted_rooms = sorted(self.available_rooms, key=lambda r: r.number)
+        if self._groups_cache is not None and self._groups_cache_version == self._version:
+            return self._groups_cache
+
         continuous_groups = []
-        current_group = [sorted_rooms[0]]
-        
-        for i in range(1, len(sorted_rooms)):
-            # Check if rooms are continuous (difference of 1 in room numbers)
-            if int(sorted_rooms[i].number) - int(sorted_rooms[i-1].number) == 1:
-                current_group.append(sorted_rooms[i])
-            else:
-                continuous_groups.append(current_group)
-                current_group = [sorted_rooms[i]]
-        
-        continuous_groups.append(current_group)
+        for template in self.run_templates:
+            current = []
+            for room in template:
+                if room.occupant_count == 0:
+                    current.append(room)
+                elif current:
+                    continuous_groups.append(current)
+                    current = []
+            if current:
+                continuous_groups.append(current)
+
+        self._groups_cache = continuous_groups
+        self._groups_cache_version = self._version
         return continuous_groups
 
 class HostelAllocationSystem:
@@ -78,10 +165,33 @@ class HostelAllocationSystem:
     def __init__(self):
         self.buildings = {}
         self.allocation_history = []
+        # Bumped on every state change; cheap cache key for UI aggregations.
+        self.state_version = 0
+        # Memoized get_hostel_status payload plus the state_version it
+        # was built at; repeat status queries on an unchanged system
+        # return the cached dict without walking any rooms.
+        self._status_cache: Optional[Dict] = None
+        self._status_cache_version = -1
+        # The instance may be shared across user sessions (e.g. via
+        # st.cache_resource), so mutations are serialized with a lock.
+        self._lock = threading.RLock()
+        # Instance-owned PRNG; avoids touching the shared module-level
+        # random state from the allocation paths.
+        self._rng = random.Random()
+        # Availability heap over floors, keyed on -available_slots with a
+        # monotonic tiebreak. Entries go stale when a floor's counters
+        # change and are discarded lazily on pop.
+        self._floor_heap = []
+        self._heap_tiebreak = 0
         self._initialize_buildings()
     
     def _initialize_buildings(self):
         """Initialize the hostel structure with all rooms."""
+        # Flat index over every room; O(1) lookups by room id. The
+        # owning floor is stored alongside so lookups never have to
+        # parse the floor back out of the id string.
+        self._rooms_by_id: Dict[str, Tuple[Room, Floor]] = {}
+
         # Building A initialization
         building_a_rooms = {
             'A0': ['001', '002', '003', '004', '005', '013', '014', '015', '016', '017', 
@@ -100,6 +210,7 @@ class HostelAllocationSystem:
             for room_num in room_numbers:
                 room = Room(building='A', floor=floor[1], number=room_num)
                 floor_obj.rooms.append(room)
+            self._finalize_floor(floor_obj)
             self.buildings['A'][floor] = floor_obj
         
         # Building B initialization
@@ -110,209 +221,422 @@ class HostelAllocationSystem:
                 room_num = f"{i:03d}"
                 room = Room(building='B', floor=floor_num, number=room_num)
                 floor_obj.rooms.append(room)
+            self._finalize_floor(floor_obj)
             self.buildings['B'][f'B{floor_num}'] = floor_obj
+
+        # (Re)build the availability heap from scratch
+        self._floor_heap = []
+        self._heap_tiebreak = 0
+        for building in self.buildings.values():
+            for floor_obj in building.values():
+                self._heap_update(floor_obj)
     
+    def _finalize_floor(self, floor_obj: Floor):
+        """Sort a freshly built floor's rooms and set up its derived state."""
+        floor_obj.rooms.sort(key=lambda r: int(r.number))
+        floor_obj._avail_rooms = len(floor_obj.rooms)
+        floor_obj._avail_slots = len(floor_obj.rooms) * 2
+        floor_obj._avail_mask = 0
+        for room in floor_obj.rooms:
+            self._rooms_by_id[room.room_id] = (room, floor_obj)
+            floor_obj.rooms_by_num[room.number_int] = room
+            floor_obj._avail_mask |= 1 << room.number_int
+
+        # Partial evaluation of adjacency: rooms are already sorted, so
+        # maximal number-adjacent runs are fixed for the floor's lifetime
+        floor_obj.run_templates = []
+        template: List[Room] = []
+        prev_num = None
+        for room in floor_obj.rooms:
+            if prev_num is not None and room.number_int != prev_num + 1:
+                floor_obj.run_templates.append(template)
+                template = []
+            template.append(room)
+            prev_num = room.number_int
+        if template:
+            floor_obj.run_templates.append(template)
+
+    def _heap_update(self, floor: Floor):
+        """Push a floor's current availability onto the heap (O(log F)).
+
+        Older entries for the same floor become stale and are dropped
+        lazily when popped.
+        """
+        self._heap_tiebreak += 1
+        heapq.heappush(self._floor_heap,
+                       (-floor.total_available_slots, floor.floor_id, self._heap_tiebreak, floor))
+
+    def _max_floor_slots(self) -> int:
+        """Largest single-floor availability, read off the heap top.
+
+        Stale entries are popped off the top first, so the common case is
+        a constant-time peek.
+        """
+        while self._floor_heap:
+            entry = self._floor_heap[0]
+            if -entry[0] == entry[3].total_available_slots:
+                return -entry[0]
+            heapq.heappop(self._floor_heap)
+        return 0
+
     def get_all_floors_with_availability(self) -> List[Tuple[Floor, int]]:
-        """Returns all floors with their available slot count, sorted by availability."""
+        """Returns all floors with their available slot count, sorted by availability.
+
+        Drains the availability heap, discarding stale and duplicate
+        entries, and pushes the live entries back for the next query —
+        so the common case is a near-sorted pass with no explicit sort.
+        """
         floors_with_availability = []
-        
-        for building in self.buildings.values():
-            for floor in building.values():
-                available_slots = floor.total_available_slots
-                if available_slots > 0:
-                    floors_with_availability.append((floor, available_slots))
-        
-        # Sort by available slots (descending) for better group placement
-        floors_with_availability.sort(key=lambda x: x[1], reverse=True)
+        live_entries = []
+        seen = set()
+
+        while self._floor_heap:
+            entry = heapq.heappop(self._floor_heap)
+            neg_slots, floor = entry[0], entry[3]
+            if id(floor) in seen or -neg_slots != floor.total_available_slots:
+                continue  # stale or duplicate entry
+            seen.add(id(floor))
+            if floor.total_available_slots > 0:
+                floors_with_availability.append((floor, floor.total_available_slots))
+                live_entries.append(entry)
+
+        for entry in live_entries:
+            heapq.heappush(self._floor_heap, entry)
         return floors_with_availability
     
-    def allocate_rooms(self, group_size: int, roll_numbers: List[str]) -> Dict[str, str]:
+    def allocate_rooms(self, group_size: int, roll_numbers: List[str]) -> Tuple[Dict[str, RoomRef], Dict]:
         """
         Allocate rooms for a group of students (one representative per room).
-        
+
         Args:
             group_size: Number of rooms needed for the group
             roll_numbers: List of representative student roll numbers (one per room)
-            
+
         Returns:
-            Dictionary mapping roll numbers to room IDs
+            Tuple of (dictionary mapping roll numbers to RoomRef tuples,
+            stats dict with 'floors_used' and 'buildings_used' counts)
         """
         if len(roll_numbers) != group_size:
             raise ValueError(f"Number of rooms ({group_size}) doesn't match number of roll numbers ({len(roll_numbers)})")
         
         if group_size > 15:  # Max 15 rooms per group
             raise ValueError("Group size cannot exceed 15 rooms")
-        
-        allocation = {}
-        remaining_students = roll_numbers.copy()
-        random.shuffle(remaining_students)  # Randomize student order for fairness
-        
-        # Get all floors with availability
-        floors_with_availability = self.get_all_floors_with_availability()
-        
-        if not floors_with_availability:
-            raise ValueError("No available rooms in the hostel")
-        
-        # Try to allocate the entire group on a single floor
-        allocated = self._try_single_floor_allocation(remaining_students, floors_with_availability, allocation)
-        
-        if not allocated:
-            # If single floor allocation fails, try multi-floor allocation
-            self._multi_floor_allocation(remaining_students, floors_with_availability, allocation)
-        
-        # Record allocation in history
-        self.allocation_history.append({
-            'timestamp': datetime.now().isoformat(),
-            'group_size': group_size,
-            'allocation': allocation.copy()
-        })
-        
-        return allocation
+
+        with self._lock:
+            allocation = {}
+            remaining_students = roll_numbers.copy()
+
+            # Get all floors with availability
+            floors_with_availability = self.get_all_floors_with_availability()
+
+            if not floors_with_availability:
+                raise ValueError("No available rooms in the hostel")
+
+            # Try to allocate the entire group on a single floor
+            allocated = self._try_single_floor_allocation(remaining_students, floors_with_availability, allocation)
+
+            if not allocated:
+                # If single floor allocation fails, try multi-floor allocation
+                self._multi_floor_allocation(remaining_students, floors_with_availability, allocation)
+
+            # Record allocation in history (room ids only, keeps the JSON
+            # save format unchanged)
+            self.allocation_history.append({
+                'timestamp': datetime.now().isoformat(),
+                'group_size': group_size,
+                'allocation': {roll: ref.full_id for roll, ref in allocation.items()}
+            })
+            self.state_version += 1
+
+            # Placement metadata the caller would otherwise re-derive
+            stats = {
+                'floors_used': len({ref.floor for ref in allocation.values()}),
+                'buildings_used': len({ref.building for ref in allocation.values()})
+            }
+
+            return allocation, stats
     
-    def _try_single_floor_allocation(self, students: List[str], floors: List[Tuple[Floor, int]], 
-                                    allocation: Dict[str, str]) -> bool:
+    def _try_single_floor_allocation(self, students: List[str], floors: List[Tuple[Floor, int]],
+                                    allocation: Dict[str, RoomRef]) -> bool:
         """Try to allocate all students on a single floor (one student per room)."""
         required_rooms = len(students)  # Each student represents one room
-        
-        # Randomize floor selection for fairness
-        available_floors = [(f, slots) for f, slots in floors if slots >= required_rooms * 2]  # Need 2 slots per room
-        if not available_floors:
+
+        # Randomize student order for fairness (done lazily, here, since
+        # room assignment order is the only thing it affects)
+        self._rng.shuffle(students)
+
+        # Cheap feasibility check: if even the most-available floor can't
+        # host the whole group, skip straight to the multi-floor path
+        if self._max_floor_slots() < required_rooms * 2:
+            return False
+
+        # Reservoir-sample one eligible floor in a single pass: uniform
+        # choice without materializing the filtered list
+        selected_floor = None
+        eligible = 0
+        for floor, slots in floors:
+            if slots >= required_rooms * 2:  # Need 2 slots per room
+                eligible += 1
+                if self._rng.randrange(eligible) == 0:
+                    selected_floor = floor
+        if selected_floor is None:
             return False
         
-        selected_floor, _ = random.choice(available_floors)
-        
-        # Get continuous room groups on the selected floor
+        # Prefer one contiguous run of exactly the required length; the
+        # bitmask finds it with a few shift-and-AND steps
+        start = selected_floor.find_run_start(required_rooms)
+        if start >= 0:
+            for student_idx, student in enumerate(students):
+                room = selected_floor.rooms_by_num[start + student_idx]
+                room.occupy(student, selected_floor)
+                allocation[student] = RoomRef(
+                    room.building, f"{room.building}{room.floor}", room.number, room.room_id)
+            self._heap_update(selected_floor)
+            return True
+
+        # Otherwise fall back to filling the floor's fragmented groups
         continuous_groups = selected_floor.get_continuous_available_rooms()
-        
+
         # Try to allocate in continuous rooms
         student_idx = 0
         for group in continuous_groups:
             for room in group:
                 if room.is_available and room.available_slots == 2 and student_idx < len(students):
                     # Mark room as fully occupied with the representative student
-                    room.occupied_by.append(students[student_idx])
-                    room.occupied_by.append(f"{students[student_idx]}_roommate")  # Placeholder for roommate
-                    allocation[students[student_idx]] = room.room_id
+                    room.occupy(students[student_idx], selected_floor)
+                    allocation[students[student_idx]] = RoomRef(
+                        room.building, f"{room.building}{room.floor}", room.number, room.room_id)
                     student_idx += 1
-        
+
+        if student_idx:
+            self._heap_update(selected_floor)
         return student_idx == len(students)
     
-    def _multi_floor_allocation(self, students: List[str], floors: List[Tuple[Floor, int]], 
-                               allocation: Dict[str, str]):
-        """Allocate students across multiple floors, keeping subgroups together (one student per room)."""
-        remaining_students = students.copy()
-        
-        while remaining_students:
-            # Refresh available floors
-            floors_with_availability = self.get_all_floors_with_availability()
-            if not floors_with_availability:
-                raise ValueError(f"Not enough rooms available. {len(remaining_students)} rooms couldn't be allocated.")
-            
-            # Select a floor (randomized for fairness)
-            selected_floor, available_slots = random.choice(floors_with_availability)
-            
-            # Determine how many rooms to allocate on this floor
-            available_rooms = available_slots // 2  # Each room needs 2 slots
-            rooms_to_place = min(len(remaining_students), available_rooms)
-            floor_students = remaining_students[:rooms_to_place]
-            
-            # Allocate on the selected floor
-            continuous_groups = selected_floor.get_continuous_available_rooms()
-            student_idx = 0
-            
-            for group in continuous_groups:
-                for room in group:
-                    if room.is_available and room.available_slots == 2 and student_idx < len(floor_students):
-                        room.occupied_by.append(floor_students[student_idx])
-                        room.occupied_by.append(f"{floor_students[student_idx]}_roommate")
-                        allocation[floor_students[student_idx]] = room.room_id
-                        student_idx += 1
-            
-            # Remove allocated students
-            remaining_students = remaining_students[rooms_to_place:]
+    def _multi_floor_allocation(self, students: List[str], floors: List[Tuple[Floor, int]],
+                               allocation: Dict[str, RoomRef]):
+        """Allocate students across multiple floors, keeping subgroups together (one student per room).
+
+        Follows the FA_heu equal-excess reservation policy: each floor
+        holds back an equal share of the hostel's post-allocation excess
+        rooms, instead of greedily draining the most-available floor.
+        That leaves every floor with comparable headroom, so later groups
+        are more likely to fit compactly instead of fragmenting.
+        """
+        needed = len(students)
+        free_rooms = sum(slots for _, slots in floors) // 2  # 2 slots per room
+
+        if free_rooms < needed:
+            raise ValueError(f"Not enough rooms available. {needed - free_rooms} rooms couldn't be allocated.")
+
+        # Equal per-floor share of the rooms that will remain free after
+        # this group is placed
+        reserve = (free_rooms - needed) // len(floors)
+
+        idx = 0
+        # The first pass honors each floor's reserve; the second drops it
+        # to place whatever the integer split left over.
+        for hold_back in (reserve, 0):
+            for selected_floor, _ in floors:
+                if idx == needed:
+                    return
+                usable = min(selected_floor.total_available_slots // 2 - hold_back,
+                             needed - idx)
+                if usable <= 0:
+                    continue
+                end = idx + usable
+
+                for group in selected_floor.get_continuous_available_rooms():
+                    for room in group:
+                        if room.is_available and room.available_slots == 2 and idx < end:
+                            student = students[idx]
+                            room.occupy(student, selected_floor)
+                            allocation[student] = RoomRef(
+                                room.building, f"{room.building}{room.floor}", room.number, room.room_id)
+                            idx += 1
+
+                self._heap_update(selected_floor)
     
-    def get_hostel_status(self) -> Dict:
-        """Get current status of all rooms in the hostel."""
-        status = {
-            'total_rooms': 0,
-            'occupied_rooms': 0,
-            'available_rooms': 0,
-            'total_slots': 0,
-            'occupied_slots': 0,
-            'available_slots': 0,
-            'buildings': {}
+    def to_dataframe(self):
+        """Return a flat DataFrame of all rooms (one row per room).
+
+        Columns: building, floor, room_id, representative, occupied_count.
+        Built with a single list comprehension and one DataFrame call so
+        callers can filter with vectorized boolean masks instead of
+        looping over room objects.
+        """
+        import pandas as pd
+
+        rows = [
+            {
+                'building': room.building,
+                'floor': floor_name,
+                'room_id': room.room_id,
+                'representative': room.representative or '',
+                'occupied_count': room.occupant_count
+            }
+            for building in self.buildings.values()
+            for floor_name, floor in building.items()
+            for room in floor.rooms
+        ]
+        return pd.DataFrame(rows)
+
+    def get_status_summary(self) -> Dict:
+        """Get hostel-wide occupancy totals.
+
+        Reads only the per-floor counters, so the summary costs O(floors)
+        with no per-room iteration.
+        """
+        total_rooms = 0
+        available_rooms = 0
+        available_slots = 0
+
+        for building in self.buildings.values():
+            for floor in building.values():
+                total_rooms += len(floor.rooms)
+                available_rooms += floor.available_room_count
+                available_slots += floor.total_available_slots
+
+        total_slots = total_rooms * 2
+        return {
+            'total_rooms': total_rooms,
+            'occupied_rooms': total_rooms - available_rooms,
+            'available_rooms': available_rooms,
+            'total_slots': total_slots,
+            'occupied_slots': total_slots - available_slots,
+            'available_slots': available_slots
         }
-        
+
+    def get_hostel_status(self) -> Dict:
+        """Get current status of all rooms in the hostel.
+
+        Memoized against state_version: repeat calls between allocations
+        (e.g. successive CLI status queries) return the cached payload
+        instead of rebuilding it. Callers treat the result as read-only.
+        """
+        if self._status_cache is not None and self._status_cache_version == self.state_version:
+            return self._status_cache
+
+        status = self.get_status_summary()
+        status['buildings'] = {}
+
         for building_name, building in self.buildings.items():
             building_status = {
                 'floors': {}
             }
-            
+
             for floor_name, floor in building.items():
-                floor_status = {
+                building_status['floors'][floor_name] = {
                     'total_rooms': len(floor.rooms),
-                    'available_rooms': len(floor.available_rooms),
+                    'available_rooms': floor.available_room_count,
                     'available_slots': floor.total_available_slots,
-                    'rooms': []
+                    # Built as a single comprehension: LIST_APPEND
+                    # bytecode and one pre-sized allocation instead of
+                    # repeated append calls and resizes
+                    'rooms': [
+                        {
+                            'room_id': room.room_id,
+                            'representative': room.representative,
+                            'occupant_count': room.occupant_count,
+                            'available_slots': room.capacity - room.occupant_count
+                        }
+                        for room in floor.rooms
+                    ]
                 }
-                
-                for room in floor.rooms:
-                    room_info = {
-                        'room_id': room.room_id,
-                        'occupied_by': room.occupied_by,
-                        'available_slots': room.available_slots
-                    }
-                    floor_status['rooms'].append(room_info)
-                
-                building_status['floors'][floor_name] = floor_status
-                
-                # Update totals
-                status['total_rooms'] += len(floor.rooms)
-                status['available_rooms'] += len(floor.available_rooms)
-                status['total_slots'] += len(floor.rooms) * 2
-                status['available_slots'] += floor.total_available_slots
-        
-        status['occupied_rooms'] = status['total_rooms'] - status['available_rooms']
-        status['occupied_slots'] = status['total_slots'] - status['available_slots']
-        status['buildings'] = building_status
-        
+
+            status['buildings'][building_name] = building_status
+
+        self._status_cache = status
+        self._status_cache_version = self.state_version
         return status
     
     def reset_allocations(self):
         """Reset all room allocations."""
-        self._initialize_buildings()
-        self.allocation_history = []
+        with self._lock:
+            self._initialize_buildings()
+            self.allocation_history = []
+            self.state_version += 1
     
     def save_state(self, filename: str):
-        """Save current allocation state to a file."""
+        """Save current allocation state to a file.
+
+        Only the allocation history is persisted — room occupancy is
+        fully derivable from it on load, and the hostel status dump it
+        replaced serialized every room redundantly.
+        """
         state = {
-            'hostel_status': self.get_hostel_status(),
+            'version': 1,
             'allocation_history': self.allocation_history
         }
-        with open(filename, 'w') as f:
-            json.dump(state, f, indent=2)
+        if orjson is not None:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(state, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w') as f:
+                json.dump(state, f, indent=2)
     
+    def _replay_allocation(self, allocation: Dict[str, str]):
+        """Re-apply a single historical allocation record to the rooms."""
+        for roll_number, room_id in allocation.items():
+            entry = self._rooms_by_id.get(room_id)
+            if entry is None:
+                continue
+            room, floor = entry
+            if room.occupant_count:
+                continue
+
+            room.occupy(roll_number, floor)
+            self._heap_update(floor)
+
+    def load_state_dict(self, state: Dict):
+        """Load allocation state from an already-parsed state dict.
+
+        Lets callers that have the state in memory (e.g. from an upload)
+        apply it directly without serializing to disk and parsing again.
+        """
+        with self._lock:
+            # Reconstruct allocations from history
+            self.reset_allocations()
+            for allocation_record in state['allocation_history']:
+                self._replay_allocation(allocation_record['allocation'])
+            self.allocation_history = state['allocation_history']
+            self.state_version += 1
+
     def load_state(self, filename: str):
         """Load allocation state from a file."""
-        with open(filename, 'r') as f:
-            state = json.load(f)
-        
-        # Reconstruct allocations from history
-        self.reset_allocations()
-        for allocation_record in state['allocation_history']:
-            # Re-apply allocations
-            for roll_number, room_id in allocation_record['allocation'].items():
-                building, floor_room = room_id.split('-')
-                floor_id = building[:2]
-                room_number = floor_room
-                
-                # Find and allocate the room
-                floor = self.buildings[building[0]][floor_id]
-                for room in floor.rooms:
-                    if room.number == room_number and len(room.occupied_by) == 0:
-                        room.occupied_by.append(roll_number)
-                        room.occupied_by.append(f"{roll_number}_roommate")
-                        break
+        with open(filename, 'rb') as f:
+            if orjson is not None:
+                state = orjson.loads(f.read())
+            else:
+                state = json.load(f)
+        self.load_state_dict(state)
+
+    def load_state_stream(self, fp):
+        """Load allocation state incrementally from a file-like object.
+
+        Parses the saved JSON with ijson instead of materializing the
+        whole state tree in memory. Lets callers pass an upload buffer
+        directly, with no temp file and no second parse. The stream is
+        consumed completely before any live state is touched, so a
+        truncated or malformed upload raises from the parser and leaves
+        the current allocations intact.
+        """
+        import ijson
+
+        history = [
+            {
+                'timestamp': allocation_record['timestamp'],
+                'group_size': int(allocation_record['group_size']),
+                'allocation': dict(allocation_record['allocation'])
+            }
+            for allocation_record in ijson.items(fp, 'allocation_history.item')
+        ]
+
+        with self._lock:
+            self.reset_allocations()
+            for record in history:
+                self._replay_allocation(record['allocation'])
+            self.allocation_history = history
+            self.state_version += 1
 
 
 # Command-line interface
@@ -335,17 +659,17 @@ def main():
                 roll_numbers_input = input("Enter roll numbers (one per room, comma-separated): ")
                 roll_numbers = [r.strip() for r in roll_numbers_input.split(',')]
                 
-                allocation = system.allocate_rooms(group_size, roll_numbers)
-                
+                allocation, stats = system.allocate_rooms(group_size, roll_numbers)
+
                 print("\n=== Allocation Result ===")
-                for roll, room in allocation.items():
-                    print(f"{roll}: {room}")
+                for roll, ref in allocation.items():
+                    print(f"{roll}: {ref.full_id}")
                 
             except Exception as e:
                 print(f"Error: {e}")
         
         elif command == 'status':
-            status = system.get_hostel_status()
+            status = system.get_status_summary()
             print(f"\n=== Hostel Status ===")
             print(f"Total Rooms: {status['total_rooms']}")
             print(f"Occupied Rooms: {status['occupied_rooms']}")